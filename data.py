@@ -1,30 +1,117 @@
-import quandl as q
+import os
 import pandas as pd
 import numpy as np
 
-#Key to connect to the Quandl API
-#TODO: configure api key as env variable in cloudapps
-q.ApiConfig.api_key = "xaFxr9SP6Wd5sKFHdEax"
+#Quandl dataset code for the risk free rate, also used as a file name by the local provider
+RISK_FREE_CODE = "DTB1YR"
+
+####### Data providers #######
+
+#Every provider returns a date indexed frame, an 'Adj_Close' column for stocks and a 'Value' column for rates
+
+#Live data from the Quandl API
+class QuandlProvider(object):
+
+    def __init__(self, api_key=None):
+        import quandl as q #Only needed when this provider is used
+        self.q = q
+
+        #Key to connect to the Quandl API, without one Quandl's anonymous rate limits apply
+        api_key = api_key or os.environ.get("QUANDL_API_KEY")
+        if api_key:
+            self.q.ApiConfig.api_key = api_key
+
+    def get_prices(self, stock, start_date, end_date):
+        return self.q.get("EOD/{0}.11".format(stock), #Only pull closing price
+                          start_date="{0}".format(start_date),
+                          end_date="{0}".format(end_date))
+
+    def get_rates(self, start_date, end_date):
+        return self.q.get("FRED/{0}".format(RISK_FREE_CODE), start_date="{0}".format(start_date), end_date="{0}".format(end_date))
+
+#Reads <directory>/<code>.csv or <directory>/<code>.parquet, eg a local mirror of Quandl
+class LocalFileProvider(object):
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def read(self, code, start_date, end_date):
+        parquet_path = os.path.join(self.directory, "{0}.parquet".format(code))
+        if os.path.exists(parquet_path):
+            frame = pd.read_parquet(parquet_path)
+        else:
+            frame = pd.read_csv(os.path.join(self.directory, "{0}.csv".format(code)), index_col=0, parse_dates=True)
+
+        frame.index = pd.to_datetime(frame.index)
+        return frame.sort_index().loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
+
+    def get_prices(self, stock, start_date, end_date):
+        return self.read(stock, start_date, end_date)
+
+    def get_rates(self, start_date, end_date):
+        return self.read(RISK_FREE_CODE, start_date, end_date)
+
+#Serves frames held in memory, keyed by stock symbol, rates frame passed separately
+class InMemoryProvider(object):
+
+    def __init__(self, stock_frames, rate_frame=None):
+        self.stock_frames = stock_frames
+        self.rate_frame = rate_frame
+
+    def get_prices(self, stock, start_date, end_date):
+        return self.stock_frames[stock].sort_index().loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
+
+    def get_rates(self, start_date, end_date):
+        if self.rate_frame is None:
+            raise ValueError("InMemoryProvider has no rates, pass rate_frame to load them")
+        return self.rate_frame.sort_index().loc[pd.to_datetime(start_date):pd.to_datetime(end_date)]
+
+#Active provider, built lazily from configuration (see provider_from_config)
+_provider = None
+
+#DATA_PROVIDER selects the backend: quandl (default) or local (reads DATA_DIR), InMemoryProvider is only set in code with set_provider
+def provider_from_config(config=None):
+    config = os.environ if config is None else config
+    name = config.get("DATA_PROVIDER", "quandl").lower()
+
+    if name == "quandl":
+        return QuandlProvider(config.get("QUANDL_API_KEY"))
+    elif name == "local":
+        return LocalFileProvider(config.get("DATA_DIR", "data"))
+    else:
+        raise ValueError("Unknown data provider: {0}".format(name))
+
+def set_provider(provider):
+    global _provider
+    _provider = provider
+
+def get_provider():
+    if _provider is None:
+        set_provider(provider_from_config())
+    return _provider
+
+####### Preprocessing #######
 
 #Pull only adjusted closing price
-def pull_data(stocks, start_date, end_date):
+def pull_data(stocks, start_date, end_date, provider=None):
     #TODO: Add validation for stocks
+    provider = provider or get_provider()
 
     stock_dict = {}
 
     for stock in stocks:
-        stock_data = q.get("EOD/{0}.11".format(stock), #Only pull closing price
-				start_date="{0}".format(start_date), #Pull an extra month of data
-				end_date="{0}".format(end_date))
-        
+        stock_data = provider.get_prices(stock, start_date, end_date)
+
         stock_dict[stock] = stock_data#.loc[start_date:end_date]
 
     return {'stock_dict':stock_dict 
             }
 
 #Proxied by the US 1 year treasury (beginning of the period)
-def get_risk_free_rate(start_date,end_date):
-    rf_rate = q.get("FRED/DTB1YR", start_date="{0}".format(start_date),end_date="{0}".format(end_date))["Value"].mean()
+def get_risk_free_rate(start_date,end_date, provider=None):
+    provider = provider or get_provider()
+
+    rf_rate = provider.get_rates(start_date, end_date)["Value"].mean()
     daily_rf_rate = np.power((rf_rate + 1), 1.0/252) - 1 #deannualize rf rate
 
     return {"rf_rate": rf_rate,
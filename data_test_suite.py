@@ -1,5 +1,5 @@
 import pytest
-from data import pull_data, get_risk_free_rate, calculate_returns
+from data import pull_data, get_risk_free_rate, calculate_returns, InMemoryProvider, LocalFileProvider, provider_from_config
 from portfolio import Portfolio
 import pandas as pd
 
@@ -52,3 +52,78 @@ class TestDataClass(object):
         results = calculate_returns(test_dict)
 
         assert (results['FB']['Log Returns'].iloc[0] - .0953) < .0001 #Log percent change between 10 and 11 is approx 9.53%
+
+class TestProviderClass(object):
+    #Offline price and rate frames, shaped like the Quandl responses
+    def build_frames(self):
+        dates = pd.bdate_range('2018-01-01', '2018-01-31')
+        stock_frames = {'FB': pd.DataFrame({'Adj_Close': [100.0 + i for i in range(len(dates))]}, index=dates),
+                        'IBM': pd.DataFrame({'Adj_Close': [150.0 - i for i in range(len(dates))]}, index=dates)}
+        rate_frame = pd.DataFrame({'Value': [1.0] * len(dates)}, index=dates)
+        return stock_frames, rate_frame
+
+    #Test that the in memory provider is sliced to the requested dates
+    def test_in_memory_pull(self):
+        stock_frames, rate_frame = self.build_frames()
+        provider = InMemoryProvider(stock_frames, rate_frame)
+
+        results = pull_data(['FB','IBM'], pd.to_datetime('2018-01-08'), pd.to_datetime('2018-01-12'), provider=provider)
+
+        assert len(results['stock_dict'].keys()) == 2
+        assert results['stock_dict']['FB'].shape[0] == 5 #One trading week
+
+    #Test that the risk free rate is deannualized from the provider's rates
+    def test_in_memory_rf_rate(self):
+        stock_frames, rate_frame = self.build_frames()
+        provider = InMemoryProvider(stock_frames, rate_frame)
+
+        interest_rates = get_risk_free_rate(pd.to_datetime('2018-01-01'), pd.to_datetime('2018-01-31'), provider=provider)
+
+        assert interest_rates['rf_rate'] == 1.0
+        assert abs(interest_rates['daily_rf_rate'] - (2.0 ** (1.0/252) - 1)) < 1e-12
+
+    #Test that a provider built without rates says so
+    def test_in_memory_missing_rates(self):
+        stock_frames, rate_frame = self.build_frames()
+        provider = InMemoryProvider(stock_frames)
+
+        with pytest.raises(ValueError):
+            get_risk_free_rate(pd.to_datetime('2018-01-01'), pd.to_datetime('2018-01-31'), provider=provider)
+
+    #Test that the local provider reads csv files named after the stock symbol
+    def test_local_file_pull(self, tmp_path):
+        stock_frames, rate_frame = self.build_frames()
+        for stock in stock_frames:
+            stock_frames[stock].to_csv(str(tmp_path / "{0}.csv".format(stock)))
+        rate_frame.to_csv(str(tmp_path / "DTB1YR.csv"))
+        provider = provider_from_config({"DATA_PROVIDER": "local", "DATA_DIR": str(tmp_path)})
+
+        results = pull_data(['FB','IBM'], pd.to_datetime('2018-01-01'), pd.to_datetime('2018-01-31'), provider=provider)
+        interest_rates = get_risk_free_rate(pd.to_datetime('2018-01-01'), pd.to_datetime('2018-01-31'), provider=provider)
+
+        assert isinstance(provider, LocalFileProvider)
+        assert results['stock_dict']['IBM'].shape[0] == 23 #Business days in January 2018
+        assert results['stock_dict']['FB']['Adj_Close'].iloc[0] == 100.0
+        assert interest_rates['rf_rate'] == 1.0
+
+    #Test that the local provider prefers parquet files when present
+    def test_local_parquet_pull(self, tmp_path):
+        pytest.importorskip("pyarrow") #Parquet support is optional
+        stock_frames, rate_frame = self.build_frames()
+        stock_frames['FB'].to_parquet(str(tmp_path / "FB.parquet"))
+        rate_frame.to_parquet(str(tmp_path / "DTB1YR.parquet"))
+        provider = LocalFileProvider(str(tmp_path))
+
+        results = pull_data(['FB'], pd.to_datetime('2018-01-08'), pd.to_datetime('2018-01-12'), provider=provider)
+        interest_rates = get_risk_free_rate(pd.to_datetime('2018-01-01'), pd.to_datetime('2018-01-31'), provider=provider)
+
+        assert results['stock_dict']['FB'].shape[0] == 5 #One trading week
+        assert results['stock_dict']['FB']['Adj_Close'].iloc[0] == 105.0 #Sixth business day of January, 2018-01-01 is a Monday
+        assert interest_rates['rf_rate'] == 1.0
+
+    #Test that an unknown provider name is rejected
+    def test_unknown_provider(self):
+        with pytest.raises(ValueError):
+            provider_from_config({"DATA_PROVIDER": "bloomberg"})
+        with pytest.raises(ValueError):
+            provider_from_config({"DATA_PROVIDER": "memory"}) #Only available through set_provider
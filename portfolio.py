@@ -1,7 +1,49 @@
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import scipy.optimize
 
+#Solver settings, part of the cache key so changing them invalidates old solutions
+SOLVER_METHOD = "SLSQP"
+SOLVER_OPTIONS = {'disp': True, #Turn off display in production
+                  'maxiter': 1000}
+
+#Memoized per-window solutions, shared across Portfolio objects (one is built per request)
+#_solution_cache is keyed on (window_key(), daily_rf_rate) and serves exact hits
+#_warm_start_cache is keyed on window_key() alone and seeds SLSQP when only the rate changed
+#Flask serves requests on several threads, so every access goes through _solution_lock
+_solution_cache = OrderedDict()
+_warm_start_cache = OrderedDict()
+_solution_lock = threading.Lock()
+SOLUTION_CACHE_SIZE = 10000 #Oldest solutions are dropped past this many windows
+
+#Content hash of a rebalance window's returns, cost flag and solver settings
+#The rate is left out because app.py averages it over the whole requested range, so extending
+#end_date changes it for every window. Those windows are re-solved, starting from the cached weights
+def window_key(sliced_assets, transaction_costs):
+    hasher = hashlib.sha1()
+    hasher.update(repr(list(sliced_assets.columns)).encode())
+    hasher.update(repr([str(date) for date in sliced_assets.index]).encode())
+    hasher.update(np.ascontiguousarray(sliced_assets.values, dtype=np.float64).tobytes())
+    hasher.update(repr(int(transaction_costs)).encode())
+    hasher.update(repr((SOLVER_METHOD, sorted(SOLVER_OPTIONS.items()))).encode())
+    return hasher.hexdigest()
+
+#Insert into one of the caches, call with _solution_lock held
+def _store_solution(cache, key, weights):
+    cache[key] = weights
+    cache.move_to_end(key)
+    while len(cache) > SOLUTION_CACHE_SIZE:
+        cache.popitem(last=False) #Drop the oldest solution
+
+#Empty the memoized solutions
+def clear_solution_cache():
+    with _solution_lock:
+        _solution_cache.clear()
+        _warm_start_cache.clear()
+
 class Portfolio(object):
 
     ####### Notes #######
@@ -106,23 +148,36 @@ class Portfolio(object):
                 #Either the first or an inner value
                 sliced_assets = self.assets.loc[self.rebalance_dates[i] : self.rebalance_dates[i+1]]
             
+            #Hash the unadjusted window, the cost flag is part of the key
+            slice_key = window_key(sliced_assets, self.transaction_costs)
+            rate_key = (slice_key, float(self.interest_rates["daily_rf_rate"]))
+
             #If transaction costs, subtract 2.5% from returns on rebalance date
             if int(self.transaction_costs) == 1:
+                sliced_assets = sliced_assets.copy()
                 sliced_assets.iloc[0] = sliced_assets.iloc[0] - .025
-                
-            results = scipy.optimize.minimize(self.objective_function, self.initial_weights, args=(sliced_assets), 
-                                                method= "SLSQP", constraints=cons, bounds=bounds, tol=None,
-                                                options={'disp': True, #Turn off display in production
-                                                         'maxiter': 1000})
+
+            #Only solve windows whose inputs have not been seen before, the solve itself runs outside the lock
+            with _solution_lock:
+                optimized_x = _solution_cache.get(rate_key)
+                start_x = _warm_start_cache.get(slice_key, self.initial_weights) #Same returns at another rate
+            if optimized_x is None:
+                results = scipy.optimize.minimize(self.objective_function, start_x, args=(sliced_assets), 
+                                                    method=SOLVER_METHOD, constraints=cons, bounds=bounds, tol=None,
+                                                    options=SOLVER_OPTIONS)
+                optimized_x = results.x
+                with _solution_lock:
+                    _store_solution(_solution_cache, rate_key, optimized_x)
+                    _store_solution(_warm_start_cache, slice_key, optimized_x)
             
             #Assign optimized weights
-            weight_list = [float(weight) for weight in results.x] #decimal
-            weights_pct = ["{0:.3f}%".format(weight * 100) for weight in results.x] #percent
+            weight_list = [float(weight) for weight in optimized_x] #decimal
+            weights_pct = ["{0:.3f}%".format(weight * 100) for weight in optimized_x] #percent
             self.optimized_weights[self.rebalance_dates[i].strftime('%Y-%m-%d')] = list(zip(sliced_assets.columns,weight_list,weights_pct)) #stock symbol, decimal, percent
             
             #Assign return values
-            self.rebalance_date_returns[self.rebalance_dates[i].strftime('%Y-%m-%d')] = float(self.calculate_total_return(results.x, sliced_assets))
-            cumulative_return_tracker = cumulative_return_tracker + float(self.calculate_total_return(results.x, sliced_assets))
+            self.rebalance_date_returns[self.rebalance_dates[i].strftime('%Y-%m-%d')] = float(self.calculate_total_return(optimized_x, sliced_assets))
+            cumulative_return_tracker = cumulative_return_tracker + float(self.calculate_total_return(optimized_x, sliced_assets))
             self.cumulative_returns[self.rebalance_dates[i].strftime('%Y-%m-%d')] = cumulative_return_tracker
         
         return {"optimized_weights": self.optimized_weights,
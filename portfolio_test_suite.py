@@ -1,6 +1,8 @@
 import pytest
-from data import pull_data, get_risk_free_rate, calculate_returns
-from portfolio import Portfolio
+from data import pull_data, get_risk_free_rate, calculate_returns, InMemoryProvider
+from portfolio import Portfolio, clear_solution_cache
+import portfolio
+import numpy as np
 import pandas as pd
 
 #Think about using fixtures to setup configuration
@@ -119,6 +121,34 @@ class TestDataClass(object):
 
         assert (results['FB']['Log Returns'].iloc[0] - .0953) < .0001 #Log percent change between 10 and 11 is approx 9.53%
 
+#Synthetic returns and rising rates so the memoization tests run offline, records every SLSQP call
+@pytest.fixture
+def initialize_memo_variables(monkeypatch):
+    pytest.memo_dates = pd.bdate_range('2018-01-01', '2018-04-30')
+    rng = np.random.RandomState(0)
+    pytest.memo_return_dict = {stock: pd.DataFrame({'Log Returns': rng.normal(0, .01, len(pytest.memo_dates))}, index=pytest.memo_dates) for stock in ['A','B','C']}
+    pytest.memo_provider = InMemoryProvider({}, pd.DataFrame({'Value': np.linspace(.01, .03, len(pytest.memo_dates))}, index=pytest.memo_dates))
+
+    pytest.solver_calls = [] #(starting weights, iterations) per solve
+    minimize = portfolio.scipy.optimize.minimize
+    def recording_minimize(fun, x0, *args, **kwargs):
+        start = np.array(x0)
+        results = minimize(fun, x0, *args, **kwargs)
+        pytest.solver_calls.append((start, results.nit))
+        return results
+    monkeypatch.setattr(portfolio.scipy.optimize, 'minimize', recording_minimize)
+
+    clear_solution_cache()
+    yield
+    clear_solution_cache()
+
+#Portfolio over the synthetic data, rate taken from get_risk_free_rate as in app.py
+def build_memo_portfolio(end_date, transaction_costs=0):
+    start_date = pytest.memo_dates[0]
+    return_dict = {stock: pytest.memo_return_dict[stock].loc[:end_date] for stock in pytest.memo_return_dict}
+    interest_rates = get_risk_free_rate(start_date, end_date, provider=pytest.memo_provider)
+    return Portfolio(start_date, end_date, return_dict, interest_rates, 'monthly', transaction_costs)
+
 class TestPortfolioClass(object):
 
     #First I want to test that the data is being entered in Portfolio correctly
@@ -228,3 +258,46 @@ class TestPortfolioClass(object):
 
         assert var1 == tempResult
 
+    #test that repeated requests are served from the cache
+    def test_optimize_portfolio_memoized(self, initialize_memo_variables):
+        end_date = pd.to_datetime('2018-03-30')
+
+        first = build_memo_portfolio(end_date).optimize_portfolio()
+        assert len(pytest.solver_calls) == 3 #January, February, March
+
+        second = build_memo_portfolio(end_date).optimize_portfolio()
+        assert len(pytest.solver_calls) == 3 #Identical request, nothing solved
+        assert first['optimized_weights'] == second['optimized_weights']
+
+        #Toggling transaction costs is a different key, toggling back is a hit
+        build_memo_portfolio(end_date, 1).optimize_portfolio()
+        assert len(pytest.solver_calls) == 6
+        build_memo_portfolio(end_date, 0).optimize_portfolio()
+        assert len(pytest.solver_calls) == 6
+
+    #test that extending the range warm starts the earlier windows from their cached weights
+    def test_optimize_portfolio_memoized_extension(self, initialize_memo_variables):
+        short_end = pd.to_datetime('2018-03-30')
+        long_end = pytest.memo_dates[-1]
+
+        short = build_memo_portfolio(short_end)
+        short_output = short.optimize_portfolio()
+        short_solutions = [[weight for stock, weight, pct in window] for window in short_output['optimized_weights'].values()]
+        assert all((x0 == short.initial_weights).all() for x0, nit in pytest.solver_calls) #Cold start
+
+        #The mean rate moves with the range, so each window is solved again from its cached weights
+        assert build_memo_portfolio(long_end).interest_rates['daily_rf_rate'] != short.interest_rates['daily_rf_rate']
+        del pytest.solver_calls[:]
+        build_memo_portfolio(long_end).optimize_portfolio()
+        warm_calls = list(pytest.solver_calls)
+        assert len(warm_calls) == 4 #March 31 2018 is a Saturday, so only April is a new window
+        for (x0, nit), solution in zip(warm_calls[:3], short_solutions):
+            assert np.allclose(x0, solution) #Started from the short run's weights
+        assert (warm_calls[3][0] == short.initial_weights).all() #April has nothing cached
+
+        #Same windows solved cold take more SLSQP iterations
+        clear_solution_cache()
+        del pytest.solver_calls[:]
+        build_memo_portfolio(long_end).optimize_portfolio()
+        cold_calls = list(pytest.solver_calls)
+        assert sum(nit for x0, nit in warm_calls[:3]) < sum(nit for x0, nit in cold_calls[:3])